@@ -0,0 +1,275 @@
+from Modules.SW import SmithWaterman
+from array import array
+import hashlib
+import multiprocessing
+import os
+import sys
+
+class AllVsAll:
+
+
+
+    # The main idea behind this class is to compute the local alignment Score of every pair of sequences of a FASTA file
+    # without running <align.py> N^2 times. Only the Scores are needed, so the score-only fast path of the
+    # Smith-Waterman algorithm (<SmithWaterman.scoreOnly>) is used and no traceback is performed.
+    #
+    #        1) identical sequences are aligned only once: every record is mapped to its unique sequence
+    #
+    #        2) the Score is symmetric, so only the upper triangle (diagonal included) of the unique sequences is computed
+    #
+    #        3) the pairs are distributed over a pool of processes, the largest pairs first, so that the
+    #           long alignments do not end up alone at the end of the run
+    #
+    #        4) each computed Score is immediately appended to a checkpoint file. If the run is interrupted,
+    #           running the same command again only computes the missing pairs. The first line of the checkpoint
+    #           file contains the scores used for the alignments, and each pair is saved as the SHA-1 digests
+    #           of its two sequences:
+    #
+    #               #scores 1   -1  -2
+    #               3f2a...  9c1e...  3
+    #               3f2a...  3f2a...  8
+    #
+    # Initialization of the class.
+    # ^
+    def __init__(self, fastaFile, outputFile, checkpointFile, scores = [1,-1,-2], processes = None, distance = False, verbose = False):
+
+        if type(scores) != list or len(scores) != 3:
+            raise TypeError("Scores must be inserted in the list form [match, mismatch, gap]")
+
+        if not (outputFile.endswith(".tsv") or outputFile.endswith(".npy")):
+            raise ValueError("The output file must have the extension '.tsv' or '.npy'")
+
+        self.fastaFile = fastaFile
+        self.outputFile = outputFile
+        self.checkpointFile = checkpointFile
+        self.scores = scores
+        self.processes = processes
+        self.distance = distance
+        self.verbose = verbose
+
+        self.ids = list()
+        self.uniqueSequences = list()
+        self.digests = list()
+        self.recordToUnique = list()
+        self.pairScores = dict()
+
+
+
+    # This function is the first one to be called inside <__call__>.
+    # It reads the FASTA file and fills <self.ids> with the names of the records, <self.uniqueSequences> with the
+    # distinct sequences and <self.recordToUnique> with the position of the sequence of each record inside
+    # <self.uniqueSequences>.
+    #
+    #   >seq_a                  self.ids = ["seq_a", "seq_b", "seq_c"]
+    #   TACGG                   self.uniqueSequences = ["TACGG", "TAGCC"]
+    #   >seq_b        ---->     self.recordToUnique = [0, 1, 0]
+    #   TAGCC
+    #   >seq_c
+    #   TACGG
+    # ^
+    def readFasta(self):
+
+        records = list()
+
+        with open(self.fastaFile) as f:
+            for line in f:
+                line = line.strip()
+                if line == "":
+                    continue
+                if line.startswith(">"):
+                    records.append([line[1:].split()[0], ""])
+                elif len(records) == 0:
+                    raise ValueError("The file {} is not in FASTA format".format(self.fastaFile))
+                else:
+                    records[-1][1] += line
+
+        positions = dict()
+
+        for name, sequence in records:
+            if sequence.isalpha() == False:
+                raise TypeError("Sequence {} must contain alphabetic characters only".format(name))
+
+            sequence = sequence.upper()
+            if sequence not in positions:
+                positions[sequence] = len(self.uniqueSequences)
+                self.uniqueSequences.append(sequence)
+                self.digests.append(hashlib.sha1(sequence.encode()).hexdigest())
+
+            self.ids.append(name)
+            self.recordToUnique.append(positions[sequence])
+
+
+
+    # This function is the second one to be called inside <__call__>.
+    # If a checkpoint file from a previous run exists, the Scores that were already computed are loaded into
+    # <self.pairScores>. The pairs are saved as digests of the sequences and not as indexes, so the checkpoint is
+    # still valid if the records of the FASTA file are reordered.
+    # A checkpoint that was computed with different scores is refused. If the previous run was interrupted
+    # while writing a line, the incomplete line is removed from the file, so the next lines are appended correctly.
+    # ^
+    def loadCheckpoint(self):
+
+        if not os.path.exists(self.checkpointFile):
+            return
+
+        with open(self.checkpointFile, "rb") as f:
+            content = f.read()
+
+        #only the lines that end with a newline were completely written
+        completeLength = content.rfind(b"\n") + 1
+        if completeLength < len(content):
+            with open(self.checkpointFile, "r+b") as f:
+                f.truncate(completeLength)
+
+        lines = content[:completeLength].decode().splitlines()
+        if len(lines) == 0:
+            return
+
+        if lines[0] != self.checkpointHeader():
+            raise ValueError("The checkpoint file {} was computed with different scores ({}). Delete it or choose another checkpoint file".format(self.checkpointFile, lines[0]))
+
+        for line in lines[1:]:
+            fields = line.split("\t")
+            self.pairScores[(fields[0], fields[1])] = int(fields[2])
+
+        if self.verbose:
+            print("{} pairs loaded from {}".format(len(self.pairScores), self.checkpointFile))
+
+
+
+    # This function is called inside <self.loadCheckpoint> and <self.computeScores>.
+    # It returns the first line of the checkpoint file, containing the scores used for the alignments
+    # ^
+    def checkpointHeader(self):
+        return "#scores\t" + "\t".join(str(x) for x in self.scores)
+
+
+
+    # This function is the third one to be called inside <__call__>.
+    # It builds the list of the missing pairs of the upper triangle, sorts them from the largest to the smallest
+    # (the cost of an alignment is proportional to len(s1) * len(s2)) and computes them over a pool of processes.
+    # ^
+    def computeScores(self):
+
+        tasks = list()
+
+        for u in range(len(self.uniqueSequences)):
+            for v in range(u, len(self.uniqueSequences)):
+                d1 = self.digests[u]
+                d2 = self.digests[v]
+                if (d1, d2) not in self.pairScores and (d2, d1) not in self.pairScores:
+                    tasks.append((d1, d2, self.uniqueSequences[u], self.uniqueSequences[v], self.scores))
+
+        tasks.sort(key = lambda task: len(task[2]) * len(task[3]), reverse = True)
+
+        if self.verbose:
+            print("{} pairs to compute".format(len(tasks)))
+
+        if len(tasks) == 0:
+            return
+
+        with open(self.checkpointFile, "a") as checkpoint:
+            if checkpoint.tell() == 0:
+                checkpoint.write(self.checkpointHeader() + "\n")
+
+            with multiprocessing.Pool(self.processes) as pool:
+                for d1, d2, score in pool.imap_unordered(scorePair, tasks):
+                    self.pairScores[(d1, d2)] = score
+                    checkpoint.write("{}\t{}\t{}\n".format(d1, d2, score))
+                    checkpoint.flush()
+
+
+
+    # This function is called inside <self.writeMatrix>.
+    # It returns the Score of the records in positions a and b of <self.ids>. If <self.distance> is True, the Score
+    # is converted into a distance normalized by the self-alignment Scores:
+    #
+    #       d(a,b) = 1 - S(a,b) / min(S(a,a), S(b,b))
+    # ^
+    def getValue(self, a, b):
+
+        d1 = self.digests[self.recordToUnique[a]]
+        d2 = self.digests[self.recordToUnique[b]]
+
+        if (d1, d2) in self.pairScores:
+            score = self.pairScores[(d1, d2)]
+        else:
+            score = self.pairScores[(d2, d1)]
+
+        if not self.distance:
+            return score
+
+        if d1 == d2:
+            return 0.0
+
+        selfScore = min(self.pairScores[(d1, d1)], self.pairScores[(d2, d2)])
+        if selfScore <= 0:
+            return 1.0
+
+        return max(0.0, 1.0 - score / selfScore)
+
+
+
+    # This function is the fourth one to be called inside <__call__>.
+    # It writes the dense (records x records) matrix to <self.outputFile>, either as a TSV table with the names
+    # of the records as header, or as a NumPy <.npy> file (int64 for Scores, float64 for distances).
+    # ^
+    def writeMatrix(self):
+
+        N = len(self.ids)
+        matrix = [[self.getValue(a, b) for b in range(N)] for a in range(N)]
+
+        if self.outputFile.endswith(".tsv"):
+            with open(self.outputFile, "w") as f:
+                f.write("\t" + "\t".join(self.ids) + "\n")
+                for a in range(N):
+                    f.write(self.ids[a] + "\t" + "\t".join(str(x) for x in matrix[a]) + "\n")
+        else:
+            self.writeNpy(matrix)
+
+
+
+    # This function is called inside <self.writeMatrix>.
+    # The <.npy> format is written directly (magic string, header with dtype and shape, raw little-endian data)
+    # so that NumPy is needed only to read the file and not to run the program.
+    # ^
+    def writeNpy(self, matrix):
+
+        typecode, descr = ("d", "<f8") if self.distance else ("q", "<i8")
+
+        header = "{{'descr': '{}', 'fortran_order': False, 'shape': ({}, {}), }}".format(descr, len(matrix), len(matrix))
+        #the total length of the preamble must be a multiple of 64 bytes
+        padding = 64 - (10 + len(header) + 1) % 64
+        header += " " * padding + "\n"
+
+        data = array(typecode, [x for row in matrix for x in row])
+        if sys.byteorder == "big":
+            data.byteswap()
+
+        with open(self.outputFile, "wb") as f:
+            f.write(b"\x93NUMPY\x01\x00")
+            f.write(len(header).to_bytes(2, "little"))
+            f.write(header.encode("latin1"))
+            f.write(data.tobytes())
+
+
+
+    # This function is directly called from allvsall.py as a result of the input given to argparse
+    # ^
+    def __call__(self):
+        self.readFasta()
+        self.loadCheckpoint()
+        self.computeScores()
+        self.writeMatrix()
+
+        if self.verbose:
+            print("{} records, {} unique sequences, matrix written to {}".format(len(self.ids), len(self.uniqueSequences), self.outputFile))
+
+
+
+# This function is executed by the processes of the pool inside <AllVsAll.computeScores>.
+# It is defined outside of the class so that it can be sent to the processes.
+# ^
+def scorePair(task):
+    d1, d2, s1, s2, scores = task
+    return (d1, d2, SmithWaterman(s1, s2, False, "best", False, scores).scoreOnly())
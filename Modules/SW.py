@@ -21,6 +21,8 @@ class SmithWaterman:
         self.graph = ds.Graph()
         self.sortedNodesByScore = dict()
         self.allPaths = dict()
+        self.bestScore = 0
+        self.tracebackMemo = dict()
 
         #parameters
         self.printMatrix = printSM
@@ -88,70 +90,178 @@ class SmithWaterman:
     # ^
     def fillNodeTable(self):
 
+        n = len(self.s1) + 1
+        m = len(self.s2) + 1
+
+        for i in range(1,m):
+            for j in range(1,n):
+                self.fillCell(i,j)
+        
+        #print("sorted:",self.sortedNodesByScore)
+    
+
+
+    # This function is called inside <self.fillNodeTable> and inside <self.extendTable>.
+    # It computes the Score of the Node in position (i,j) and performs the three steps described above
+    # for that single Node only. The Nodes in positions (i-1,j-1), (i-1,j) and (i,j-1) must already be filled.
+    # ^
+    def fillCell(self, i, j):
+
         """part 1 - table filling"""
+
+        diagonal = -1
+
+        if self.s1[j-1] == self.s2[i-1]:
+            
+            #if match
+
+            diagonal = self.nodeTable[i-1][j-1].getScore() + self.scores[0]
+        else:
+
+            #if mismatch
+
+            diagonal = self.nodeTable[i-1][j-1].getScore() + self.scores[1]
+            
+        up = self.nodeTable[i-1][j].getScore() + self.scores[2]
+        left = self.nodeTable[i][j-1].getScore() + self.scores[2]
+        
+        choice = max(diagonal,up,left)
+
+        currentNode = self.nodeTable[i][j]
+        if choice > 0:                    
+            currentNode.setScore(choice)
+
+        """
+        part 2 - self.sortedNodesByScore
+
+        Add each node in the dictionary based on its score 
+        """
         
+        if choice > 0:
+            if choice not in self.sortedNodesByScore:
+                self.sortedNodesByScore[choice] = [currentNode]
+            else:
+                self.sortedNodesByScore[choice].append(currentNode)
+
+            if choice > self.bestScore:
+                self.bestScore = choice
+
+        """part 3 - graph generation"""                    
+
+
+        if choice == diagonal and currentNode.getScore() > 0:
+            previousNode = self.nodeTable[i-1][j-1]
+            
+            self.graph.insertEdge(currentNode,previousNode)
+
+
+        if choice == up and currentNode.getScore() > 0:
+            previousNode = self.nodeTable[i-1][j]
+            
+            self.graph.insertEdge(currentNode,previousNode)
+
+
+        if choice == left and currentNode.getScore() > 0:
+            previousNode = self.nodeTable[i][j-1]
+            
+            self.graph.insertEdge(currentNode,previousNode)
+
+
+
+    # This function is a score-only fast path of the Smith-Waterman algorithm: it returns the best local alignment
+    # Score of <self.s1> and <self.s2> without building <self.nodeTable>, the graph or the alignments.
+    # Only the previous row of Scores is needed to compute the current one, so two lists of <int> are enough.
+    # It is used by the all-vs-all mode (look at <AllVsAll.py>), where only the Scores are required.
+    # ^
+    def scoreOnly(self):
+
         n = len(self.s1) + 1
         m = len(self.s2) + 1
+        best = 0
 
+        previousRow = [0] * n
         for i in range(1,m):
+            currentRow = [0] * n
             for j in range(1,n):
-                
-                diagonal = -1
 
                 if self.s1[j-1] == self.s2[i-1]:
-                    
-                    #if match
-
-                    diagonal = self.nodeTable[i-1][j-1].getScore() + self.scores[0]
+                    diagonal = previousRow[j-1] + self.scores[0]
                 else:
+                    diagonal = previousRow[j-1] + self.scores[1]
 
-                    #if mismatch
+                up = previousRow[j] + self.scores[2]
+                left = currentRow[j-1] + self.scores[2]
 
-                    diagonal = self.nodeTable[i-1][j-1].getScore() + self.scores[1]
-                    
-                up = self.nodeTable[i-1][j].getScore() + self.scores[2]
-                left = self.nodeTable[i][j-1].getScore() + self.scores[2]
-                
-                choice = max(diagonal,up,left)
+                choice = max(diagonal,up,left,0)
+                currentRow[j] = choice
+                if choice > best:
+                    best = choice
 
-                currentNode = self.nodeTable[i][j]
-                if choice > 0:                    
-                    currentNode.setScore(choice)
+            previousRow = currentRow
 
-                """
-                part 2 - self.sortedNodesByScore
+        return best
 
-                Add each node in the dictionary based on its score 
-                """
-                
-                if choice > 0:
-                    if choice not in self.sortedNodesByScore:
-                        self.sortedNodesByScore[choice] = [currentNode]
-                    else:
-                        self.sortedNodesByScore[choice].append(currentNode)
 
-                """part 3 - graph generation"""                    
 
+    # These two functions can be called after <__call__> (or after <self.fillNodeTable>) when the sequences
+    # grow over time, e.g. when reads or contigs are extended by new bases.
+    # Since the Score of a Node only depends on the Nodes above and on the left of it, appending characters
+    # to <self.s1> only adds new columns to the table and appending characters to <self.s2> only adds new rows:
+    # the Nodes that were already computed never change. Only the new Nodes are created and filled, and
+    # <self.sortedNodesByScore>, the graph and <self.bestScore> are updated with them.
+    #
+    #   s1 = "TAC" + "G"                          s2 = "TA" + "G"
+    #   ____________________________               ___________________
+    #   |        |        |  new   |               |        |        |
+    #   |Node_0_0|Node_0_1|Node_0_2|               |Node_0_0|Node_0_1|
+    #   ____________________________               ___________________
+    #   |        |        |  new   |               |  new   |  new   |
+    #   |Node_1_0|Node_1_1|Node_1_2|               |Node_1_0|Node_1_1|
+    #   ____________________________               ___________________
+    #
+    # The alignments have to be generated again by calling <self.filterAlignments>.
+    # ^
+    def extendSeq1(self, characters):
+        self.extendTable(characters, "")
 
-                if choice == diagonal and currentNode.getScore() > 0:
-                    previousNode = self.nodeTable[i-1][j-1]
-                    
-                    self.graph.insertEdge(currentNode,previousNode)
+    def extendSeq2(self, characters):
+        self.extendTable("", characters)
 
 
-                if choice == up and currentNode.getScore() > 0:
-                    previousNode = self.nodeTable[i-1][j]
-                    
-                    self.graph.insertEdge(currentNode,previousNode)
 
+    # This function is called inside <self.extendSeq1> and <self.extendSeq2>.
+    # ^
+    def extendTable(self, characters1, characters2):
+
+        if (characters1 != "" and characters1.isalpha() == False) or (characters2 != "" and characters2.isalpha() == False):
+            raise TypeError("Sequences must be of type <string> and characters must be alphabetic only")
+
+        old_n = len(self.s1) + 1
+        old_m = len(self.s2) + 1
+
+        self.s1 += characters1.upper()
+        self.s2 += characters2.upper()
+
+        if len(self.nodeTable) == 0:
+            #the table was not built yet, <self.populateNodeTable> will take care of the new characters
+            return
+
+        n = len(self.s1) + 1
+        m = len(self.s2) + 1
+
+        #new columns
+        for i in range(old_m):
+            self.nodeTable[i].extend([ds.Node(i,x) for x in range(old_n, n)])
+            if i > 0:
+                for j in range(old_n, n):
+                    self.fillCell(i,j)
+
+        #new rows
+        for i in range(old_m, m):
+            self.nodeTable.append([ds.Node(i,x) for x in range(n)])
+            for j in range(1, n):
+                self.fillCell(i,j)
 
-                if choice == left and currentNode.getScore() > 0:
-                    previousNode = self.nodeTable[i][j-1]
-                    
-                    self.graph.insertEdge(currentNode,previousNode)
-        
-        #print("sorted:",self.sortedNodesByScore)
-    
 
 
     # This function is the third to be called inside <__call__>.
@@ -171,10 +281,8 @@ class SmithWaterman:
         print("____ _    _ ____ _  _ _  _ ____ _  _ ___ ____\n|__| |    | | __ |\ | |\/| |___ |\ |  |  [__\n|  | |___ | |__] | \| |  | |___ | \|  |  ___]\n")
 
         if self.filteringParam == "best":
-            tmp_scores = list(self.sortedNodesByScore.keys())
-            tmp_scores.sort()
-            listAlignment = self.allPaths[tmp_scores[-1]]
-            self.printAlignments(listAlignment,tmp_scores[-1])
+            listAlignment = self.allPaths[self.bestScore]
+            self.printAlignments(listAlignment,self.bestScore)
             
         elif self.filteringParam == "all":
             tmp_scores = list(self.sortedNodesByScore.keys())
@@ -248,25 +356,25 @@ class SmithWaterman:
 
 
     # This function is called inside <self.filterAlignments>.
-    # For every connected components in the Graph, it runs a BFS algorithm to return all the possible 
-    # paths, where each one of them correponds to a possible alignment. The list of Nodes that constitute 
-    # a path is then given as input to <self.buildAlignmentString> that converts it into a human-readable form.  
+    # For every starting Node in <self.sortedNodesByScore> it retrieves all the possible paths to the end of its
+    # connected component, where each one of them correponds to a possible alignment, already converted into
+    # the human-readable form by <self.memoizedTraceback>.
+    # The alignments of each starting Node are sorted by length, so they are returned in the same order as
+    # the paths given by <Graph.BFS>.
     # ^
     def generateAlignments(self, verbose = False):
 
+        self.allPaths = dict()
+        self.memoizedTraceback()
+
         for key in self.sortedNodesByScore:
             for stratingNode in self.sortedNodesByScore[key]:
-                paths = self.graph.BFS(stratingNode)
-
-                #for path in paths:
-                #    print([node.getName() for node in path])
+                alignments = sorted(self.tracebackMemo[stratingNode], key = lambda alignmentTuple: len(alignmentTuple[1]))
 
-                for path in paths:
-                    alignmentTuple = self.buildAlignmentString(path)
-                    if key not in self.allPaths:
-                        self.allPaths[key] = [alignmentTuple]
-                    else:
-                        self.allPaths[key].append(alignmentTuple)
+                if key not in self.allPaths:
+                    self.allPaths[key] = alignments
+                else:
+                    self.allPaths[key].extend(alignments)
                 
         
         #print(self.allPaths)
@@ -274,6 +382,52 @@ class SmithWaterman:
 
 
     # This function is called inside <self.generateAlignments>.
+    # Running <Graph.BFS> from every starting Node visits the same Nodes over and over: the paths of a Node are
+    # visited again for each Node that comes before it. Instead, the Nodes of the graph are processed only once in
+    # topological order (row by row, since every edge goes from (i,j) to a Node above or on the left of it), and
+    # <self.tracebackMemo> saves, for each Node, the list of the alignments that end in that Node.
+    # The alignments of a Node are built by adding one column to the alignments of the Nodes it is connected to:
+    #
+    #   tracebackMemo[node_2_2] = [("TA", "**", "TA")]
+    #                                    |
+    #                                    | + ("C", "*", "C")
+    #                                    v
+    #   tracebackMemo[node_3_3] = [("TAC", "***", "TAC")]
+    #
+    # The Nodes that were already processed are skipped, so after <self.extendSeq1> or <self.extendSeq2> only the
+    # new Nodes are processed.
+    # ^
+    def memoizedTraceback(self):
+
+        for i in range(len(self.nodeTable)):
+            for node in self.nodeTable[i]:
+
+                if node in self.tracebackMemo:
+                    continue
+
+                adjacentNodes = self.graph.adjacentNodes(node)
+
+                if adjacentNodes is None:
+                    #the Node is not part of the graph
+                    continue
+
+                if adjacentNodes == {}:
+                    #end of the connected component
+                    self.tracebackMemo[node] = [("", "", "")]
+                    continue
+
+                alignments = list()
+                for previousNode in adjacentNodes:
+                    character1, symbol, character2 = self.buildAlignmentColumn(previousNode, node)
+                    for seq1_out, symbols, seq2_out in self.tracebackMemo[previousNode]:
+                        alignments.append((seq1_out + character1, symbols + symbol, seq2_out + character2))
+
+                self.tracebackMemo[node] = alignments
+
+
+
+    # This function is not used by <self.generateAlignments> anymore, but it can still be used to convert
+    # a single path returned by <Graph.BFS>.
     # It takes a list of nodes as input (that represent a path) and returns the human-readable alignment
     #
     # from:     path 1 = [node_3_4, node_2_3, node_2_2, node_1_1]
@@ -287,45 +441,52 @@ class SmithWaterman:
         seq1_out = ""
         symbols = ""
         seq2_out = ""
-
-        pre_i = int(path[-1].getName().split("_")[1])
-        pre_j = int(path[-1].getName().split("_")[2])
-        previousIndexes = (pre_i,pre_j)
         
         for k in range(len(path)-2,-1,-1):
-            i = int(path[k].getName().split("_")[1])
-            j = int(path[k].getName().split("_")[2])
-
-            character1 = "_"
-            character2 = "_"
-            tmp_symbol = " "
-
-            if i > previousIndexes[0] and j > previousIndexes [1]:
-                #match or mismatch
-                character1 = self.s1[j - 1]
-                character2 = self.s2[i - 1]
-                if self.s1[j - 1] == self.s2[i - 1]:
-                    #match
-                    tmp_symbol = "*"
-                else:
-                    #mismatch
-                    tmp_symbol = "|"
-            elif i > previousIndexes[0] and j == previousIndexes[1]:
-                #gap on sequence 1
-                character2 = self.s2[i - 1]
-            elif i == previousIndexes[0] and j > previousIndexes[1]:
-                #gap on sequence 2
-                character1 = self.s1[j - 1]
-            
+            character1, tmp_symbol, character2 = self.buildAlignmentColumn(path[k+1], path[k])
+
             seq1_out += character1 
             symbols += tmp_symbol 
             seq2_out += character2 
 
-            previousIndexes = (i,j)
-
         return (seq1_out, symbols, seq2_out)
 
 
+
+    # This function is called inside <self.memoizedTraceback> and <self.buildAlignmentString>.
+    # It returns the column of the alignment that corresponds to the step from <previousNode> to <node>
+    # ^
+    def buildAlignmentColumn(self, previousNode, node):
+
+        pre_i = int(previousNode.getName().split("_")[1])
+        pre_j = int(previousNode.getName().split("_")[2])
+        i = int(node.getName().split("_")[1])
+        j = int(node.getName().split("_")[2])
+
+        character1 = "_"
+        character2 = "_"
+        tmp_symbol = " "
+
+        if i > pre_i and j > pre_j:
+            #match or mismatch
+            character1 = self.s1[j - 1]
+            character2 = self.s2[i - 1]
+            if self.s1[j - 1] == self.s2[i - 1]:
+                #match
+                tmp_symbol = "*"
+            else:
+                #mismatch
+                tmp_symbol = "|"
+        elif i > pre_i and j == pre_j:
+            #gap on sequence 1
+            character2 = self.s2[i - 1]
+        elif i == pre_i and j > pre_j:
+            #gap on sequence 2
+            character1 = self.s1[j - 1]
+
+        return (character1, tmp_symbol, character2)
+
+
     
     # This function prints the Score matrix using ASCII characters
     # ^
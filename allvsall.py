@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+
+
+import argparse
+from Modules.AllVsAll import AllVsAll
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="""allvsall.py - local alignment scores of every pair of sequences in a FASTA file""",
+    epilog= 'UNITN - Algorithms for Bioinformatics - July 2021 - Paolo Bianco')
+
+    parser.add_argument("fasta", type = str,
+                                        help = "The FASTA file containing the sequences you want to align [Input type: <str>]")
+
+    parser.add_argument("output", type = str,
+                                        help = "The file where the matrix is written. The format depends on the extension: '.tsv' or '.npy' [Input type: <str>]")
+
+    parser.add_argument("-s", "--scores", type = int, nargs=3, default=[1,-1,-2],
+            help="The scores to be used during the alignment. How to use: '-s 2 -2 -3'.[Input type: <int>. Default values: match=1, mismatch=-1, gap=-2]")
+
+    parser.add_argument("-c", "--checkpoint", type = str, default=None,
+            help="The file where the computed scores are saved while running. If the run is interrupted, launch the same command again to resume it. [Input type: <str>. Default: <output>.checkpoint.tsv]")
+
+    parser.add_argument("-p", "--processes", type = int, default=None,
+            help="The number of processes used to compute the alignments. [Input type: <int>. Default: number of CPUs]")
+
+    parser.add_argument('--distance', dest='distance', action='store_true', help="Add the flag '--distance' if you want the normalized distance 1 - S(a,b)/min(S(a,a),S(b,b)) instead of the scores.")
+    parser.set_defaults(distance=False)
+
+    parser.add_argument('--verbose', dest='verbose', action='store_true', help="Add the flag '--verbose' if you want information about the progress of the computation.")
+    parser.set_defaults(verbose=False)
+
+
+    args = parser.parse_args()
+    checkpoint = args.checkpoint
+    if checkpoint is None:
+        checkpoint = args.output + ".checkpoint.tsv"
+
+    AllVsAll(args.fasta, args.output, checkpoint, args.scores, args.processes, args.distance, args.verbose)()